@@ -0,0 +1,32 @@
+import functools                            # Keeps endpoint names on the wrapped handlers
+import hmac                                 # Constant-time token comparison
+import os                                   # Admin token from the environment
+import warnings                             # Startup warning when admin routes are disabled
+import orjson                               # Encodes error responses
+from starlette.responses import Response    # Raw response so we can send orjson bytes
+from starlette.routing import Route         # Admin routes mounted next to the Shiny app
+
+# /admin/* requests must send "Authorization: Bearer <token>". When no token is set the
+# admin routes refuse every request: the client address can't stand in for a token,
+# since behind a reverse proxy every request appears to come from the proxy's host
+ADMIN_TOKEN = os.environ.get("SAFEDROP_ADMIN_TOKEN", "")
+if not ADMIN_TOKEN:
+    warnings.warn("SAFEDROP_ADMIN_TOKEN is not set; /admin routes are disabled", RuntimeWarning)
+
+# True if the request may use admin routes
+def is_admin_request(request):
+    if not ADMIN_TOKEN:
+        return False
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+# Route whose endpoint answers 403 unless the request passes is_admin_request
+def admin_route(path, endpoint, methods):
+    @functools.wraps(endpoint)
+    async def guarded(request):
+        if not ADMIN_TOKEN:
+            return Response(orjson.dumps({"error": "Admin routes are disabled; set SAFEDROP_ADMIN_TOKEN"}), status_code=403, media_type="application/json")
+        if not is_admin_request(request):
+            return Response(orjson.dumps({"error": "Admin access required"}), status_code=403, media_type="application/json")
+        return await endpoint(request)
+    return Route(path, guarded, methods=methods)
@@ -4,14 +4,25 @@ from utils import (                         # Importing utility functions and mo
     validate_test_pickup_code,              # Function to check if entered pickup code matches the generated one
     get_local_businesses,                   # Function that returns a preset list of mock business names
     get_random_businesses_with_distances,   # Picks random businesses and attaches fake distances
+    split_business_distance,                # Splits a dropdown choice into (business, miles)
     get_fake_contract_text,                 # Returns HTML-formatted fake contract for business registration
     is_valid_email,                         # Checks if an email format is valid
     package_db,                             # In-memory mock package database grouped by status
     move_package,                           # Moves a package from one state to another in the mock DB
     search_package,                         # Searches the mock DB for packages matching query
-    initialize_mock_packages                # Pre-fills the mock DB with packages in various states
+    fuzzy_search_package,                   # Typo-tolerant name search ranked by edit distance
+    initialize_mock_packages,               # Pre-fills the mock DB with packages in various states
+    create_customer_package,                # Adds the package a test customer is picking up
+    assign_package_center,                  # Routes a package to a retrieval center with room
+    center_scheduler                        # Capacity-aware assignment of packages to retrieval centers
 )
+from webhooks import webhook_routes          # Carrier status webhook endpoints served next to the Shiny app
+from sessions import register_session, session_routes  # Per-session accounting, idle eviction and admin view
+from profiling import profiled, profiling_routes  # Opt-in profiling of slow user actions
+from outbox import outbox_routes             # Admin view of the drop-off alert outbox
 from shiny.types import ImgData             # For loading image assets in Shiny apps
+from starlette.applications import Starlette  # Outer ASGI app that hosts both Shiny and the webhooks
+from starlette.routing import Mount         # Mounts the Shiny app under the outer ASGI app
 from pathlib import Path                    # For referencing local files like images
 import asyncio                              # Enables async functionality when needed
 
@@ -157,6 +168,7 @@ app_ui = ui.page_fluid(
             ui.card(
                 ui.h4("📦 Package Management Dashboard"),
                 ui.input_text("search_query", "Search by name or tracking ID"),  # Search bar
+                ui.input_checkbox("fuzzy_search", "Typo-tolerant name search", value=False),  # Match misspelled names
                 ui.input_action_button("search_btn", "Search", class_="btn-info"),  # Search button
                 ui.output_ui("search_results")  # Render search results
             ),
@@ -171,10 +183,18 @@ app_ui = ui.page_fluid(
             ui.card(
                 ui.h4("✅ Picked Up in the Last 24 Hours"),  # Lists recently picked-up packages
                 ui.output_ui("picked_up_list")
+            ),
+            ui.card(
+                ui.h4("🏪 Retrieval Center Load"),  # How full each center is and how evenly load is spread
+                ui.output_ui("center_balance")
             )
         )
     )
 )
+# Populate the package database with mock data once when the app first launches
+# (shared by every session, so it must not be re-filled for each new tab)
+initialize_mock_packages()
+
 #Server logic
 def server(input, output, session):
     # Define reactive state variables to track inputs, outputs, and validation flags
@@ -195,7 +215,20 @@ def server(input, output, session):
     button_clicks_ready = reactive.Value({})            # Tracks button presses to mark packages as "ready"
     button_clicks_picked = reactive.Value({})           # Tracks button presses to mark packages as "picked up"
     thank_you_msg = reactive.Value("")                  # Message shown when customer locks in a center
-
+    customer_package = reactive.Value("")               # Tracking ID of the package this customer is picking up
+
+    # Track this session's activity and memory so idle tabs can be closed
+    register_session(session, {
+        "signin_result": signin_result, "passwords_match": passwords_match,
+        "generated_code": generated_code, "pickup_result": pickup_result,
+        "user_address": user_address, "business_dropdown_choices": business_dropdown_choices,
+        "temp_signup_info": temp_signup_info, "email_is_valid": email_is_valid,
+        "password_is_valid": password_is_valid, "signup_errors": signup_errors,
+        "final_status_message": final_status_message, "partner_signin_status_val": partner_signin_status_val,
+        "partner_signin_success_val": partner_signin_success_val, "button_clicks_ready": button_clicks_ready,
+        "button_clicks_picked": button_clicks_picked, "thank_you_msg": thank_you_msg,
+        "customer_package": customer_package
+    })
 
     # When user selects "Customer", reset any old state and switch UI
     @reactive.Effect
@@ -225,6 +258,10 @@ def server(input, output, session):
     def generate_test_code():
         code = generate_test_pickup_code()
         generated_code.set(code)
+        # The center locked in later is stored on this package, so its slot is held
+        # until the package is picked up, not for the lifetime of this session
+        if not customer_package.get():
+            customer_package.set(create_customer_package())
 
     # When user submits a pickup code, validate it
     @reactive.Effect
@@ -344,6 +381,7 @@ def server(input, output, session):
     # Handles validation and saving of new business registration info
     @reactive.Effect
     @reactive.event(input.save_signup_info)
+    @profiled("save_signup_info")
     async def save_signup_info():
         # Get and clean email/passwords
         email = input.signup_email().strip().lower()
@@ -473,15 +511,19 @@ def server(input, output, session):
             partner_signin_status_val.set("❌ Incorrect credentials.")
             partner_signin_success_val.set("")
 
-    # Populate the package database with mock data when the app first launches
-    initialize_mock_packages()
+    # Runs an exact or typo-tolerant search depending on the dashboard checkbox
+    def run_search(query):
+        if input.fuzzy_search():
+            return fuzzy_search_package(query)
+        return search_package(query)
 
     # Define what happens when the "Search" button is clicked
     @reactive.Effect
     @reactive.event(input.search_btn)
+    @profiled("handle_search")
     def handle_search():
         query = input.search_query()  # Get the search term entered by the user
-        results = search_package(query)  # Look for matches in the mock package DB
+        results = run_search(query)  # Look for matches in the mock package DB
         session.send_input_message("search_results_data", {"value": results})  # Send results to UI
 
     # Render the search results in the UI
@@ -491,7 +533,7 @@ def server(input, output, session):
         query = input.search_query()
         if not query:
             return ui.p("No search input.")
-        results = search_package(query)
+        results = run_search(query)
         if not results:
             return ui.p("No matching packages found.")
         return ui.TagList(
@@ -531,7 +573,7 @@ def server(input, output, session):
     @render.ui
     def on_the_way_list():
         return ui.TagList(
-            *[package_card(pkg, "on_the_way", "ready_for_pickup", "move_ready") for pkg in package_db["on_the_way"]]
+            *[package_card(pkg, "on_the_way", "ready_for_pickup", "move_ready") for pkg in package_db["on_the_way"].values()]
         )
 
     # Display packages that are ready to be picked up
@@ -539,7 +581,7 @@ def server(input, output, session):
     @render.ui
     def ready_for_pickup_list():
         return ui.TagList(
-            *[package_card(pkg, "ready_for_pickup", "picked_up", "move_picked") for pkg in package_db["ready_for_pickup"]]
+            *[package_card(pkg, "ready_for_pickup", "picked_up", "move_picked") for pkg in package_db["ready_for_pickup"].values()]
         )
 
     # Display packages that were picked up in the last 24 hours
@@ -554,26 +596,27 @@ def server(input, output, session):
                     ui.p(f"Size: {pkg['size']} | Weight: {pkg['weight']}"),
                     ui.p(f"Picked Up: {pkg['timestamp']}")
                 )
-                for pkg in package_db["picked_up"]
+                for pkg in package_db["picked_up"].values()
             ]
         )
 
     # Logic to simulate moving a package between states using a button click
     @reactive.Effect
     @reactive.event(
-        *[getattr(input, f"move_ready_{pkg['tracking_id']}") for pkg in package_db["on_the_way"]],
-        *[getattr(input, f"move_picked_{pkg['tracking_id']}") for pkg in package_db["ready_for_pickup"]]
+        *[getattr(input, f"move_ready_{pkg['tracking_id']}") for pkg in package_db["on_the_way"].values()],
+        *[getattr(input, f"move_picked_{pkg['tracking_id']}") for pkg in package_db["ready_for_pickup"].values()]
     )
+    @profiled("fake_move_message")
     def fake_move_message():
         updated_ready = button_clicks_ready.get().copy()
         updated_picked = button_clicks_picked.get().copy()
 
-        for pkg in package_db["on_the_way"]:
+        for pkg in package_db["on_the_way"].values():
             btn_id = f"move_ready_{pkg['tracking_id']}"
             if getattr(input, btn_id, lambda: 0)() > 0:
                 updated_ready[pkg['tracking_id']] = True
 
-        for pkg in package_db["ready_for_pickup"]:
+        for pkg in package_db["ready_for_pickup"].values():
             btn_id = f"move_picked_{pkg['tracking_id']}"
             if getattr(input, btn_id, lambda: 0)() > 0:
                 updated_picked[pkg['tracking_id']] = True
@@ -581,6 +624,24 @@ def server(input, output, session):
         button_clicks_ready.set(updated_ready)
         button_clicks_picked.set(updated_picked)
 
+    # Show how full each retrieval center is, fullest first
+    @output
+    @render.ui
+    def center_balance():
+        reactive.invalidate_later(10)  # Load changes outside this session, so re-check periodically
+        metrics = center_scheduler.balance_metrics()
+        busiest = sorted(metrics["utilization"].items(), key=lambda item: item[1], reverse=True)
+        return ui.TagList(
+            ui.p(f"Load: {metrics['total_load']} / {metrics['total_capacity']} slots | "
+                 f"Average: {metrics['mean_utilization']:.0%} | Busiest: {metrics['max_utilization']:.0%} | "
+                 f"Full centers: {metrics['full_centers']}"),
+            ui.p(f"Assigned: {metrics['assigned']} | Redirected: {metrics['redirected']} | Turned away: {metrics['overflowed']}"),
+            ui.tags.ul(
+                *[ui.tags.li(f"{center}: {center_scheduler.load[center]} / {center_scheduler.capacity[center]} ({value:.0%})")
+                  for center, value in busiest[:10]]
+            )
+        )
+
     # Conditional UI hint for using the sample login
     @output
     @render.ui
@@ -594,8 +655,22 @@ def server(input, output, session):
     @reactive.event(input.lock_center_btn)
     def lock_in_center():
         center = input.retrieval_center()
-        if center:
+        if not center or not customer_package.get():
+            return
+
+        # Keep the chosen center if it has room, otherwise move to the best nearby one.
+        # Re-locking moves the package, handing back the slot at its old center
+        preferred, _ = split_business_distance(center)
+        candidates = [split_business_distance(choice) for choice in business_dropdown_choices.get()]
+        assigned = assign_package_center(customer_package.get(), candidates, preferred=preferred)
+
+        if assigned is None:
+            thank_you_msg.set("❌ Sorry, all nearby retrieval centers are full (or your package has already arrived). Please try again later.")
+            return
+        if assigned == preferred:
             thank_you_msg.set(f"🎉 Thank you for using SafeDrop! Your package is set to be delivered at **{center}**.")
+        else:
+            thank_you_msg.set(f"🎉 Thank you for using SafeDrop! **{preferred}** is full, so your package is set to be delivered at nearby **{assigned}** instead.")
 
     # Display the thank-you message in the UI
     @output
@@ -668,5 +743,8 @@ def server(input, output, session):
     def contract_text():
         return ui.HTML(get_fake_contract_text())
 
-# Link the UI and server to create the app
-app = App(app_ui, server)
+# Link the UI and server to create the Shiny app
+shiny_app = App(app_ui, server)
+
+# Serve carrier webhooks (/webhooks/...) and the admin view (/admin/...) alongside the Shiny app on the same server
+app = Starlette(routes=[*webhook_routes, *session_routes, *profiling_routes, *outbox_routes, Mount("/", app=shiny_app)])
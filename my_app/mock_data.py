@@ -0,0 +1,152 @@
+import csv                                  # Streams generated packages to CSV files
+import datetime                             # Base time for generated timestamps
+import math                                 # Rounds scaled center capacities up
+import random                               # Seeded picks for the tracking ID sequence
+import numpy as np                          # Vectorized sampling of package attributes
+import orjson                               # Fast JSONL encoding
+from utils import (
+    TRACKING_ID_SPACE,                      # Size of the PKG######### tracking ID space
+    pick_tracking_id_multiplier,            # Multiplier that turns a counter into a shuffled ID order
+    sample_names,                           # Name pairs used for the demo packages
+    get_local_businesses,                   # Retrieval centers packages are routed to
+    add_package,                            # Adds a package to package_db and the name index
+    find_package,                           # Checks whether a tracking ID is already in use
+    next_tracking_id,                       # Fresh tracking ID from the app's own sequence
+    center_scheduler                        # Per-center load used for capacity-aware assignment
+)
+
+# Columns produced for every generated package, in output order
+PACKAGE_FIELDS = ["name", "email", "tracking_id", "size", "weight", "status", "center", "timestamp"]
+
+SIZES = np.array(["Small", "Medium", "Large"])
+SIZE_WEIGHTS = np.array([0.5, 0.35, 0.15])
+# Median weight (lbs) per size; actual weights spread log-normally around it
+SIZE_MEDIAN_LBS = np.array([1.5, 5.0, 15.0])
+
+STATUSES = np.array(["on_the_way", "ready_for_pickup", "picked_up"])
+STATUS_WEIGHTS = np.array([0.4, 0.2, 0.4])
+
+# A loaded fixture stands in for a whole delivery network, so centers are resized to
+# hold its packages at this utilization instead of the handful a demo center takes
+LOADED_UTILIZATION = 0.8
+
+# Average seconds between generated packages (timestamps follow a Poisson process)
+MEAN_ARRIVAL_SECONDS = 2.0
+
+# Zipf-like popularity: the i-th item is picked in proportion to 1 / (i + 1) ** exponent
+def zipf_weights(count, exponent=1.0):
+    weights = 1.0 / np.arange(1, count + 1) ** exponent
+    return weights / weights.sum()
+
+# Generates `count` packages as column arrays, `batch_size` packages at a time.
+# The same (seed, count, batch_size) always yields exactly the same packages, and
+# tracking IDs never repeat within a seed (up to TRACKING_ID_SPACE packages)
+def generate_package_batches(count, seed=0, batch_size=100_000, start_time=None):
+    if count > TRACKING_ID_SPACE:
+        raise ValueError(f"count cannot exceed {TRACKING_ID_SPACE} unique tracking IDs")
+
+    id_rng = random.Random(seed)
+    id_offset = id_rng.randrange(TRACKING_ID_SPACE)
+    id_multiplier = pick_tracking_id_multiplier(id_rng)
+
+    first_names = np.array(sorted({first for first, _ in sample_names}))
+    last_names = np.array(sorted({last for _, last in sample_names}))
+    centers = np.array(get_local_businesses())
+    first_weights = zipf_weights(len(first_names), 0.5)
+    last_weights = zipf_weights(len(last_names), 0.8)
+    center_weights = zipf_weights(len(centers), 1.1)
+
+    if start_time is None:
+        start_time = datetime.datetime(2025, 1, 1, 8, 0)
+    base = np.datetime64(start_time, "s")
+    elapsed = 0.0
+
+    for batch_index, start in enumerate(range(0, count, batch_size)):
+        size = min(batch_size, count - start)
+        rng = np.random.default_rng([seed, batch_index])
+
+        positions = np.arange(start, start + size, dtype=np.int64)
+        id_numbers = (id_offset + positions * id_multiplier) % TRACKING_ID_SPACE
+        tracking_ids = np.char.add("PKG", np.char.zfill(id_numbers.astype(str), 9))
+
+        firsts = rng.choice(first_names, size, p=first_weights)
+        lasts = rng.choice(last_names, size, p=last_weights)
+        names = np.char.add(np.char.add(firsts, " "), lasts)
+        emails = np.char.lower(np.char.add(np.char.add(np.char.add(firsts, "."), lasts), "@example.com"))
+
+        size_codes = rng.choice(len(SIZES), size, p=SIZE_WEIGHTS)
+        weights = SIZE_MEDIAN_LBS[size_codes] * rng.lognormal(0.0, 0.4, size)
+        weights = np.clip(weights, 0.1, 70.0).round(1)
+
+        offsets = elapsed + np.cumsum(rng.exponential(MEAN_ARRIVAL_SECONDS, size))
+        elapsed = float(offsets[-1])
+        timestamps = base + offsets.astype("timedelta64[s]")
+
+        yield {
+            "name": names,
+            "email": emails,
+            "tracking_id": tracking_ids,
+            "size": SIZES[size_codes],
+            "weight": np.char.add(weights.astype(str), " lbs"),
+            "status": rng.choice(STATUSES, size, p=STATUS_WEIGHTS),
+            "center": rng.choice(centers, size, p=center_weights),
+            "timestamp": np.datetime_as_string(timestamps, unit="s")
+        }
+
+# Turns one column batch into package dictionaries shaped like package_db entries
+def batch_to_packages(batch):
+    columns = [batch[field].tolist() for field in PACKAGE_FIELDS]
+    return [dict(zip(PACKAGE_FIELDS, row)) for row in zip(*columns)]
+
+# Generates packages straight into the in-memory database, grouped by status.
+# Files keep full ISO timestamps; the database uses the dashboard's "%I:%M %p".
+# The fixture's ID sequence differs from the app's, so an ID that is already taken
+# (e.g. by the startup mock packages) is swapped for a fresh one. Returns how many were swapped
+def load_packages_into_db(count, seed=0, batch_size=100_000):
+    display_times = {}  # "YYYY-MM-DDTHH:MM" -> "HH:MM AM"; many packages share a minute
+    reassigned = 0
+    for batch in generate_package_batches(count, seed, batch_size):
+        for pkg in batch_to_packages(batch):
+            minute = pkg["timestamp"][:16]
+            if minute not in display_times:
+                display_times[minute] = datetime.datetime.fromisoformat(minute).strftime("%I:%M %p")
+            pkg["timestamp"] = display_times[minute]
+            if find_package(pkg["tracking_id"])[1] is not None:
+                pkg["tracking_id"] = next_tracking_id()
+                reassigned += 1
+            add_package(pkg)
+            if pkg["status"] != "picked_up":
+                center_scheduler.add_load(pkg["center"])
+
+    for center, load in list(center_scheduler.load.items()):
+        needed = math.ceil(load / LOADED_UTILIZATION)
+        if needed > center_scheduler.capacity[center]:
+            center_scheduler.set_capacity(center, needed)
+    return reassigned
+
+# Streams generated packages to a CSV file with a header row
+def write_packages_csv(path, count, seed=0, batch_size=100_000):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(PACKAGE_FIELDS)
+        for batch in generate_package_batches(count, seed, batch_size):
+            writer.writerows(zip(*[batch[field].tolist() for field in PACKAGE_FIELDS]))
+
+# Streams generated packages to a JSON Lines file (one package object per line)
+def write_packages_jsonl(path, count, seed=0, batch_size=100_000):
+    with open(path, "wb") as f:
+        for batch in generate_package_batches(count, seed, batch_size):
+            f.write(b"".join(orjson.dumps(pkg, option=orjson.OPT_APPEND_NEWLINE) for pkg in batch_to_packages(batch)))
+
+# Command line use: python mock_data.py packages.csv 1000000 --seed 42
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Write a reproducible synthetic package fixture")
+    parser.add_argument("path", help="Output file ending in .csv or .jsonl")
+    parser.add_argument("count", type=int, help="Number of packages to generate")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=100_000)
+    args = parser.parse_args()
+
+    writer = write_packages_jsonl if args.path.endswith(".jsonl") else write_packages_csv
+    writer(args.path, args.count, seed=args.seed, batch_size=args.batch_size)
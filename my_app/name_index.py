@@ -0,0 +1,97 @@
+from collections import defaultdict         # Maps name tokens to the packages that contain them
+import heapq                                # Picks the top-k ranked matches without a full sort
+
+# Classic Levenshtein edit distance between two strings (insert, delete, substitute)
+def levenshtein(a, b):
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,                     # deletion
+                current[j - 1] + 1,                  # insertion
+                previous[j - 1] + (char_a != char_b)  # substitution
+            ))
+        previous = current
+    return previous[-1]
+
+# Every string reachable from `word` by deleting up to `max_deletes` characters
+def deletion_variants(word, max_deletes):
+    variants = {word}
+    frontier = {word}
+    for _ in range(max_deletes):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        variants |= frontier
+    return variants
+
+# Fuzzy index over customer names. Matching works on distinct names and their
+# tokens ("jordan", "nguyen"), never on individual packages, so query cost depends on
+# how many different names match rather than how many packages share a surname.
+# Two tokens within edit distance d always share a variant made by deleting up to
+# d characters from each, so a query only looks up its own deletion variants
+class NameIndex:
+    def __init__(self, max_distance=2):
+        self.max_distance = max_distance
+        self.tokens_by_variant = defaultdict(set)   # deletion variant -> tokens that produce it
+        self.names_by_token = defaultdict(set)      # token -> normalized names containing it
+        self.packages_by_name = {}                  # normalized name -> {tracking_id: package}
+
+    # Adds a package to the index; safe to call more than once per package
+    def add(self, pkg):
+        name = " ".join(pkg["name"].lower().split())
+        packages = self.packages_by_name.get(name)
+        if packages is None:
+            packages = self.packages_by_name[name] = {}
+            for token in set(name.split()):
+                if token not in self.names_by_token:
+                    for variant in deletion_variants(token, self.max_distance):
+                        self.tokens_by_variant[variant].add(token)
+                self.names_by_token[token].add(name)
+        packages[pkg["tracking_id"]] = pkg
+
+    # Returns (distance, token) pairs for every indexed token within max_distance
+    def similar_tokens(self, token, max_distance):
+        candidates = set()
+        for variant in deletion_variants(token, max_distance):
+            candidates |= self.tokens_by_variant.get(variant, set())
+        matches = []
+        for candidate in candidates:
+            if abs(len(candidate) - len(token)) <= max_distance:
+                distance = levenshtein(token, candidate)
+                if distance <= max_distance:
+                    matches.append((distance, candidate))
+        return matches
+
+    # Returns up to `limit` packages whose name best matches the query, closest first
+    def search(self, query, max_distance=2, limit=10):
+        max_distance = min(max_distance, self.max_distance)
+        tokens = query.lower().split()
+        if not tokens:
+            return []
+
+        # Every query token must fuzzily match some token of the name; a name's
+        # score is the sum of the best distance found for each query token
+        scores = None
+        for token in tokens:
+            token_scores = {}
+            for distance, match in self.similar_tokens(token, max_distance):
+                for name in self.names_by_token[match]:
+                    if distance < token_scores.get(name, max_distance + 1):
+                        token_scores[name] = distance
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {name: scores[name] + d for name, d in token_scores.items() if name in scores}
+            if not scores:
+                return []
+
+        # Each name has at least one package, so `limit` names are always enough
+        results = []
+        for name in heapq.nsmallest(limit, scores, key=lambda name: (scores[name], name)):
+            for pkg in self.packages_by_name[name].values():
+                results.append(pkg)
+                if len(results) == limit:
+                    return results
+        return results
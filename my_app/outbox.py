@@ -0,0 +1,218 @@
+import asyncio                              # Background worker and thread offloading
+import heapq                                # Retries ordered by when they are due
+import itertools                            # Tie-breaker for retries due at the same moment
+import os                                   # SMTP settings from the environment
+import smtplib                              # SMTP client (run in worker threads so it never blocks the app)
+import time                                 # Queue lag and send throughput
+import traceback                            # Logs alerts that could not be sent at all
+from email.message import EmailMessage      # Builds the notification emails
+import orjson                               # Encodes the admin report
+from starlette.requests import Request      # Incoming admin request
+from starlette.responses import Response    # Raw response so we can send orjson bytes
+from admin import admin_route               # Admin route mounted next to the Shiny app
+
+# Where drop-off alerts are sent. For local testing run a stand-in server with
+#   python -m aiosmtpd -n -l localhost:8025
+SMTP_HOST = os.environ.get("SAFEDROP_SMTP_HOST", "localhost")
+SMTP_PORT = int(os.environ.get("SAFEDROP_SMTP_PORT", 8025))
+SMTP_FROM = os.environ.get("SAFEDROP_SMTP_FROM", "alerts@safedrop.example")
+# Open SMTP connections kept and reused across batches
+SMTP_POOL_SIZE = 4
+# Emails sent over one connection before it goes back to the pool
+BATCH_SIZE = 50
+# Seconds to wait after the first new alert so a burst of drop-offs for the same
+# customer becomes one email
+COALESCE_SECONDS = 2.0
+# Failed emails are retried after 2, 4, 8... seconds (RETRY_BASE_SECONDS doubling),
+# up to MAX_ATTEMPTS sends
+RETRY_BASE_SECONDS = 2.0
+MAX_ATTEMPTS = 5
+
+# Alerts waiting to be sent, grouped by recipient email
+pending = {}
+# Alerts waiting out a retry backoff: a heap of (due_at, sequence, recipient, alerts)
+retrying = []
+_retry_sequence = itertools.count()
+worker_task = None
+wake_worker = None
+connection_pool = None
+
+# Counters and timings exposed through the admin endpoint
+outbox_metrics = {
+    "enqueued": 0,
+    "sent_emails": 0,
+    "sent_alerts": 0,
+    "retried": 0,
+    "failed": 0,
+    "batches": 0,
+    "last_flush_emails_per_second": 0.0
+}
+
+# Queues a "ready for pickup" alert for the package's customer (no-op without an email)
+def enqueue_dropoff_alert(pkg):
+    recipient = pkg.get("email")
+    if not recipient:
+        return
+    add_pending(recipient, [{
+        "tracking_id": pkg["tracking_id"],
+        "name": pkg["name"],
+        "center": pkg.get("center", ""),
+        "enqueued_at": time.time(),
+        "attempts": 0
+    }])
+    outbox_metrics["enqueued"] += 1
+
+# Adds alerts to a recipient's pending list and wakes the worker if the app is running
+def add_pending(recipient, alerts):
+    global worker_task, wake_worker
+    pending.setdefault(recipient, []).extend(alerts)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return  # No event loop (e.g. a script loading data); alerts wait for the app to start
+    if worker_task is None or worker_task.done():
+        wake_worker = asyncio.Event()
+        worker_task = loop.create_task(send_pending_alerts())
+    wake_worker.set()
+
+# One email per recipient, listing every package that is waiting for them
+def build_email(recipient, alerts):
+    msg = EmailMessage()
+    msg["From"] = SMTP_FROM
+    msg["To"] = recipient
+    if len(alerts) == 1:
+        msg["Subject"] = "📦 Your SafeDrop package is ready for pickup"
+    else:
+        msg["Subject"] = f"📦 {len(alerts)} SafeDrop packages are ready for pickup"
+    lines = [f"Hi {alerts[0]['name']},", "", "The following packages are ready for pickup:"]
+    for alert in alerts:
+        where = f" at {alert['center']}" if alert["center"] else ""
+        lines.append(f"  • {alert['tracking_id']}{where}")
+    lines += ["", "Bring your pickup code to collect them.", "— The SafeDrop team"]
+    msg.set_content("\n".join(lines))
+    return msg
+
+# Sends a batch over one pooled connection (runs in a worker thread).
+# Returns two lists of (recipient, alerts): sends that failed and may succeed on
+# retry, and emails that could not be built or sent at all (never retried)
+def send_batch(connection, batch):
+    failed, rejected = [], []
+    for recipient, alerts in batch:
+        try:
+            message = build_email(recipient, alerts)
+            # A pooled connection may have been dropped by the server while idle,
+            # so a failure on a reused connection gets one retry on a fresh one
+            for _ in range(2 if connection[0] is not None else 1):
+                try:
+                    if connection[0] is None:
+                        connection[0] = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=10)
+                    connection[0].send_message(message)
+                    break
+                except (smtplib.SMTPException, OSError):
+                    close_connection(connection)
+            else:
+                failed.append((recipient, alerts))
+        except Exception:
+            # e.g. ValueError for an address with a line break; one bad recipient
+            # must not take the rest of the batch (or the worker) down with it
+            traceback.print_exc()
+            rejected.append((recipient, alerts))
+    return failed, rejected
+
+# Closes a pooled connection so the next email opens a new one
+def close_connection(connection):
+    if connection[0] is not None:
+        try:
+            connection[0].close()
+        except OSError:
+            pass
+        connection[0] = None
+
+# Sends one batch, then schedules retries with exponential backoff for anything that failed
+async def send_batch_from_pool(batch):
+    connection = await connection_pool.get()
+    try:
+        failed, rejected = await asyncio.to_thread(send_batch, connection, batch)
+    finally:
+        connection_pool.put_nowait(connection)
+
+    outbox_metrics["batches"] += 1
+    unsent = {recipient for recipient, _ in failed + rejected}
+    for recipient, alerts in batch:
+        if recipient not in unsent:
+            outbox_metrics["sent_emails"] += 1
+            outbox_metrics["sent_alerts"] += len(alerts)
+    for recipient, alerts in rejected:
+        outbox_metrics["failed"] += len(alerts)
+
+    for recipient, alerts in failed:
+        retry = [dict(alert, attempts=alert["attempts"] + 1) for alert in alerts if alert["attempts"] + 1 < MAX_ATTEMPTS]
+        outbox_metrics["failed"] += len(alerts) - len(retry)
+        if retry:
+            outbox_metrics["retried"] += len(retry)
+            delay = RETRY_BASE_SECONDS * 2 ** (retry[0]["attempts"] - 1)
+            heapq.heappush(retrying, (time.time() + delay, next(_retry_sequence), recipient, retry))
+    return len(batch) - len(unsent)
+
+# Moves retries whose backoff has passed back into pending
+def release_due_retries():
+    now = time.time()
+    while retrying and retrying[0][0] <= now:
+        _, _, recipient, alerts = heapq.heappop(retrying)
+        pending.setdefault(recipient, []).extend(alerts)
+
+# Background worker: gathers alerts for a moment, then sends one email per recipient
+# in batches spread across the connection pool
+async def send_pending_alerts():
+    global pending, connection_pool
+    if connection_pool is None:
+        connection_pool = asyncio.Queue()
+        for _ in range(SMTP_POOL_SIZE):
+            connection_pool.put_nowait([None])  # Each slot holds an SMTP connection (opened on first use)
+
+    while True:
+        # Sleep until new alerts arrive or the next retry is due
+        timeout = max(0.0, retrying[0][0] - time.time()) if retrying else None
+        try:
+            await asyncio.wait_for(wake_worker.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        release_due_retries()
+        if not pending:
+            wake_worker.clear()
+            continue
+        await asyncio.sleep(COALESCE_SECONDS)
+        wake_worker.clear()
+
+        waiting, pending = pending, {}
+        items = list(waiting.items())
+        if not items:
+            continue
+        batches = [items[i:i + BATCH_SIZE] for i in range(0, len(items), BATCH_SIZE)]
+        started = time.perf_counter()
+        sent = sum(await asyncio.gather(*[send_batch_from_pool(batch) for batch in batches]))
+        outbox_metrics["last_flush_emails_per_second"] = round(sent / max(time.perf_counter() - started, 1e-6), 1)
+
+# Current backlog: alerts waiting to be sent or retried, and how long the oldest has waited
+def outbox_summary():
+    now = time.time()
+    unsent = list(pending.values()) + [alerts for _, _, _, alerts in retrying]
+    oldest = min((alert["enqueued_at"] for alerts in unsent for alert in alerts), default=None)
+    return {
+        "pending_recipients": len(pending),
+        "pending_alerts": sum(len(alerts) for alerts in pending.values()),
+        "retrying_emails": len(retrying),
+        "retrying_alerts": sum(len(alerts) for _, _, _, alerts in retrying),
+        "next_retry_in_seconds": round(max(0.0, retrying[0][0] - now), 2) if retrying else None,
+        "queue_lag_seconds": round(now - oldest, 2) if oldest is not None else 0.0,
+        **outbox_metrics
+    }
+
+# GET endpoint: outbox backlog, lag and send throughput
+async def admin_outbox(request: Request):
+    return Response(orjson.dumps(outbox_summary()), media_type="application/json")
+
+# Routes mounted alongside the Shiny app in app.py
+outbox_routes = [
+    admin_route("/admin/outbox", admin_outbox, methods=["GET"])
+]
@@ -0,0 +1,215 @@
+import cProfile                             # Deterministic profiler used per action
+import collections                          # Ring buffer of recent slow profiles and stack counts
+import datetime                             # Capture time for each profile
+import functools                            # Keeps wrapped function names for Shiny
+import inspect                              # Tells async effects apart from sync ones
+import itertools                            # Numbers written profiles so file names never clash
+import os                                   # Environment switches and output directory
+import pstats                               # Profile statistics and .pstats files
+import sys                                  # Current stack of the profiled thread
+import threading                            # Stack sampler thread
+import time                                 # Wall-clock duration of each action
+import traceback                            # Logs profiler and file errors instead of raising them
+from concurrent.futures import ThreadPoolExecutor  # Writes profile files off the request path
+import orjson                               # Encodes the admin report
+from pathlib import Path                    # Output paths for written profiles
+from starlette.requests import Request      # Incoming admin request
+from starlette.responses import Response    # Raw response so we can send orjson bytes
+from admin import admin_route               # Admin routes mounted next to the Shiny app
+
+# Profiling is off unless SAFEDROP_PROFILE=1 (or switched on through /admin/profiling)
+profiling_enabled = os.environ.get("SAFEDROP_PROFILE", "0") == "1"
+# Only actions slower than this many seconds are kept
+slow_action_seconds = float(os.environ.get("SAFEDROP_PROFILE_SLOW_SECONDS", 0.5))
+# Where slow profiles are written (.pstats and collapsed-stack .folded files)
+PROFILE_DIR = Path(os.environ.get("SAFEDROP_PROFILE_DIR", "profiles"))
+# How many slow profiles are kept in memory; older ones drop off
+PROFILE_BUFFER_SIZE = 50
+# Seconds between stack samples for the collapsed-stack (.folded) output
+SAMPLE_INTERVAL_SECONDS = 0.005
+# Innermost frames kept per sampled stack, and distinct stacks kept per profile
+MAX_STACK_DEPTH = 64
+MAX_FOLDED_STACKS = 2000
+
+recent_profiles = collections.deque(maxlen=PROFILE_BUFFER_SIZE)
+_profile_counter = itertools.count(1)
+# One writer thread, so files are written and deleted in the order profiles were kept
+_profile_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="profile-writer")
+
+# Only one cProfile can run at a time, so nested profiled calls (an effect calling
+# a profiled store function) are simply counted inside the outer profile
+_profile_running = False
+
+# Samples the stack of one thread at a fixed interval while an action runs. Each sample
+# is a real call stack, so the .folded output shows actual paths (cProfile only keeps
+# caller -> callee edges, and rebuilding paths from those blows up exponentially)
+class StackSampler(threading.Thread):
+    def __init__(self, thread_id):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.samples = collections.Counter()  # Stack (outermost first) -> number of samples
+        self.labels = {}                      # Code object -> "file.py:line:function"
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(SAMPLE_INTERVAL_SECONDS):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                code = frame.f_code
+                if code not in self.labels:
+                    self.labels[code] = f"{Path(code.co_filename).name}:{code.co_firstlineno}:{code.co_name}"
+                stack.append(self.labels[code])
+                frame = frame.f_back
+            stack = tuple(reversed(stack))
+            if stack not in self.samples and len(self.samples) >= MAX_FOLDED_STACKS:
+                stack = ("[other stacks]",)
+            self.samples[stack] += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+# Collapsed-stack lines ("outer;inner;leaf microseconds") from a sampler's counts
+def folded_stacks(samples):
+    return [f"{';'.join(stack)} {round(count * SAMPLE_INTERVAL_SECONDS * 1_000_000)}" for stack, count in samples.items() if stack]
+
+# Saves a captured profile in both pstats and collapsed-stack formats (runs on the writer thread)
+def write_profile(base, stats, samples):
+    try:
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        stats.dump_stats(f"{base}.pstats")
+        Path(f"{base}.folded").write_text("\n".join(folded_stacks(samples)) + "\n", encoding="utf-8")
+    except Exception:
+        traceback.print_exc()
+
+# Keeps the profile if the action was slow enough to be interesting
+def record_profile(action, elapsed, profiler, sampler):
+    if elapsed < slow_action_seconds:
+        return
+    stats = pstats.Stats(profiler)
+    top = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:10]
+    record = {
+        "action": action,
+        "seconds": round(elapsed, 4),
+        "captured_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "samples": sum(sampler.samples.values()),
+        "top_functions": [{"function": f"{Path(f[0]).name}:{f[1]}:{f[2]}", "cumulative_seconds": round(s[3], 4)} for f, s in top]
+    }
+    record["files"] = str(PROFILE_DIR / f"{record['captured_at'].replace(':', '-')}_{next(_profile_counter)}_{action}")
+    _profile_writer.submit(write_profile, record["files"], stats, sampler.samples)
+    # The buffer also bounds disk use: files of a profile that drops out are deleted
+    if len(recent_profiles) == recent_profiles.maxlen:
+        _profile_writer.submit(delete_profile_files, recent_profiles.popleft())
+    recent_profiles.append(record)
+
+# Removes the .pstats and .folded files written for a profile (runs on the writer thread)
+def delete_profile_files(record):
+    try:
+        for suffix in (".pstats", ".folded"):
+            Path(record["files"] + suffix).unlink(missing_ok=True)
+    except Exception:
+        traceback.print_exc()
+
+# Waits until every queued profile file has been written or deleted
+def flush_profile_writes():
+    _profile_writer.submit(lambda: None).result()
+
+# Starts profiling one action and returns (profiler, sampler), or None if profiling is
+# off, already running, or could not start
+def start_profile():
+    global _profile_running
+    if not profiling_enabled or _profile_running:
+        return None
+    _profile_running = True
+    try:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    except Exception:
+        # e.g. another profiler (a debugger or coverage tool) is already active
+        traceback.print_exc()
+        _profile_running = False
+        return None
+    sampler = StackSampler(threading.get_ident())
+    sampler.start()
+    return profiler, sampler
+
+# Stops the profiler from start_profile and keeps the result if the action was slow.
+# Profiling is best effort: its errors are logged and never reach the user's action
+def finish_profile(action, profile, started):
+    global _profile_running
+    profiler, sampler = profile
+    try:
+        elapsed = time.perf_counter() - started
+        profiler.disable()
+        sampler.stop()
+        record_profile(action, elapsed, profiler, sampler)
+    except Exception:
+        traceback.print_exc()
+    finally:
+        _profile_running = False
+
+# Decorator for effects and store calls; costs one flag check while profiling is off.
+# Async effects are profiled across their awaits, so time spent in other tasks
+# during those awaits can show up in their profile too
+def profiled(action):
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                profile = start_profile()
+                if profile is None:
+                    return await fn(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    finish_profile(action, profile, started)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            profile = start_profile()
+            if profile is None:
+                return fn(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                finish_profile(action, profile, started)
+        return wrapper
+    return decorator
+
+# GET endpoint: profiling settings and the slow profiles captured so far
+async def admin_profiles(request: Request):
+    return Response(orjson.dumps({
+        "enabled": profiling_enabled,
+        "slow_action_seconds": slow_action_seconds,
+        "profile_dir": str(PROFILE_DIR),
+        "profiles": list(recent_profiles)
+    }), media_type="application/json")
+
+# POST endpoint: {"enabled": true, "slow_action_seconds": 0.2} switches profiling at runtime
+async def admin_profiling_toggle(request: Request):
+    global profiling_enabled, slow_action_seconds
+    try:
+        settings = orjson.loads(await request.body())
+    except orjson.JSONDecodeError:
+        settings = None
+    if not isinstance(settings, dict):
+        return Response(orjson.dumps({"error": "Body must be a JSON object"}), status_code=400, media_type="application/json")
+    enabled = settings.get("enabled", profiling_enabled)
+    threshold = settings.get("slow_action_seconds", slow_action_seconds)
+    if not isinstance(enabled, bool):
+        return Response(orjson.dumps({"error": "enabled must be true or false"}), status_code=400, media_type="application/json")
+    if isinstance(threshold, bool) or not isinstance(threshold, (int, float)) or threshold < 0:
+        return Response(orjson.dumps({"error": "slow_action_seconds must be a non-negative number"}), status_code=400, media_type="application/json")
+    profiling_enabled = enabled
+    slow_action_seconds = float(threshold)
+    return await admin_profiles(request)
+
+# Routes mounted alongside the Shiny app in app.py
+profiling_routes = [
+    admin_route("/admin/profiles", admin_profiles, methods=["GET"]),
+    admin_route("/admin/profiling", admin_profiling_toggle, methods=["POST"])
+]
@@ -0,0 +1,91 @@
+import heapq                                # Picks the k nearest candidate centers
+import statistics                           # Spread of center utilization for balance metrics
+
+# Packages a retrieval center can hold at once unless configured otherwise
+DEFAULT_CENTER_CAPACITY = 25
+# How many miles of extra travel a completely full center "costs"; lets a slightly
+# farther, emptier center win over a nearby one that is almost full
+FULL_CENTER_PENALTY_MILES = 5.0
+# Only the k nearest candidates are considered for each package
+NEAREST_CANDIDATES = 3
+
+# Tracks capacity and load per retrieval center and assigns packages to them.
+# A center's load is the number of packages assigned to it that have not been
+# picked up yet (both on the way and ready for pickup)
+class CenterScheduler:
+    def __init__(self, centers, capacity=DEFAULT_CENTER_CAPACITY):
+        self.capacity = {center: capacity for center in centers}
+        self.load = {center: 0 for center in centers}
+        self.assigned = 0      # Packages placed at any center
+        self.redirected = 0    # Packages placed somewhere other than the requested center
+        self.overflowed = 0    # Packages with no candidate center that had room
+
+    # Changes how many packages a center can hold
+    def set_capacity(self, center, capacity):
+        self.capacity[center] = capacity
+        self.load.setdefault(center, 0)
+
+    # True if the center can take one more package
+    def has_room(self, center):
+        return self.load.get(center, 0) < self.capacity.get(center, 0)
+
+    # Travel distance plus a penalty that grows as the center fills up
+    def cost(self, center, miles):
+        return miles + FULL_CENTER_PENALTY_MILES * self.load[center] / self.capacity[center]
+
+    # Best center with room among the k nearest (center, miles) candidates, or None
+    def suggest(self, candidates, k=NEAREST_CANDIDATES):
+        open_candidates = [(center, miles) for center, miles in candidates if self.has_room(center)]
+        nearest = heapq.nsmallest(k, open_candidates, key=lambda candidate: candidate[1])
+        if not nearest:
+            return None
+        return min(nearest, key=lambda candidate: self.cost(*candidate))[0]
+
+    # Assigns one package: keeps the preferred center if it has room, otherwise the
+    # best suggestion. Returns the chosen center, or None if every candidate is full
+    def assign(self, candidates, preferred=None, k=NEAREST_CANDIDATES):
+        if preferred is not None and self.has_room(preferred):
+            center = preferred
+        else:
+            center = self.suggest(candidates, k)
+            if center is None:
+                self.overflowed += 1
+                return None
+            if preferred is not None:
+                self.redirected += 1
+        self.add_load(center)
+        self.assigned += 1
+        return center
+
+    # Assigns a whole manifest; each row is that package's (center, miles) candidates
+    def assign_manifest(self, rows, k=NEAREST_CANDIDATES):
+        return [self.assign(candidates, k=k) for candidates in rows]
+
+    # Counts a package at a center without choosing it (e.g. when loading existing data)
+    def add_load(self, center):
+        self.load[center] = self.load.get(center, 0) + 1
+        self.capacity.setdefault(center, DEFAULT_CENTER_CAPACITY)
+
+    # Frees a slot once a package is picked up (or a customer changes their center)
+    def release(self, center):
+        if self.load.get(center, 0) > 0:
+            self.load[center] -= 1
+
+    # Utilization per center plus summary numbers for how evenly load is spread
+    def balance_metrics(self):
+        utilization = {center: self.load[center] / self.capacity[center] for center in self.capacity if self.capacity[center]}
+        values = list(utilization.values()) or [0.0]
+        return {
+            "centers": len(utilization),
+            "total_load": sum(self.load.values()),
+            "total_capacity": sum(self.capacity.values()),
+            "mean_utilization": statistics.fmean(values),
+            "max_utilization": max(values),
+            "min_utilization": min(values),
+            "utilization_stdev": statistics.pstdev(values),
+            "full_centers": sum(1 for value in values if value >= 1.0),
+            "assigned": self.assigned,
+            "redirected": self.redirected,
+            "overflowed": self.overflowed,
+            "utilization": utilization
+        }
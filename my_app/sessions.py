@@ -0,0 +1,154 @@
+import asyncio                              # Background sweep that evicts idle sessions
+import hashlib                              # Reports sessions by a label instead of their real ID
+import os                                   # Reads the idle timeout from the environment
+import sys                                  # Object sizes for the memory estimate
+import time                                 # Timestamps for session activity
+import warnings                             # Flags sessions whose activity can't be tracked
+import orjson                               # Encodes the admin report
+from shiny import reactive                  # Isolated reads of per-session reactive values
+from starlette.requests import Request      # Incoming admin request
+from starlette.responses import Response    # Raw response so we can send orjson bytes
+from admin import admin_route               # Admin route mounted next to the Shiny app
+
+# Seconds without any user activity before a session is closed (default: 1 hour)
+SESSION_IDLE_TIMEOUT = float(os.environ.get("SAFEDROP_SESSION_IDLE_SECONDS", 3600))
+# How often the sweep checks for idle sessions
+SWEEP_INTERVAL = min(60.0, SESSION_IDLE_TIMEOUT / 4)
+
+# Rough fixed cost of one input or output on the server, on top of its value
+PER_INPUT_BYTES = 600
+PER_OUTPUT_BYTES = 1500
+
+# Live sessions keyed by session ID
+active_sessions = {}
+sweep_task = None
+
+# Counters for sessions that have come and gone in this process
+session_metrics = {
+    "started": 0,
+    "ended": 0,
+    "evicted": 0
+}
+
+# Approximate memory used by a value, following containers (shared objects counted once)
+def deep_sizeof(value, seen=None):
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in value)
+    return size
+
+# Starts tracking a session; `values` maps names to the reactive.Values server() created
+def register_session(session, values):
+    global sweep_task
+    now = time.time()
+    active_sessions[session.id] = {
+        "session": session,
+        "values": values,
+        "started": now,
+        "last_activity": now,
+        "evictable": True
+    }
+    session_metrics["started"] += 1
+
+    if not track_client_input(session):
+        # Without input tracking every session would look idle, so none of them are closed
+        active_sessions[session.id]["evictable"] = False
+    session.on_ended(lambda: unregister_session(session.id))
+
+    if sweep_task is None or sweep_task.done():
+        sweep_task = asyncio.get_running_loop().create_task(sweep_idle_sessions())
+
+# Counts only input sent by this session's browser as activity. Reactive flushes
+# can't be used: Shiny runs every session's flush callbacks on any flush, including
+# server-driven ones such as invalidate_later timers. Shiny has no public hook for
+# incoming client messages, so the session's input handler is wrapped instead.
+# Returns False if this Shiny version has no such handler
+def track_client_input(session):
+    manage_inputs = getattr(session, "_manage_inputs", None)
+    if manage_inputs is None:
+        warnings.warn("Shiny session has no _manage_inputs; idle sessions will not be evicted", RuntimeWarning)
+        return False
+
+    def manage_inputs_and_touch(data):
+        manage_inputs(data)
+        # .clientdata_* keys are sent by the browser itself (resizes, hidden outputs)
+        if any(not key.startswith(".clientdata_") for key in data):
+            touch_session(session.id)
+
+    session._manage_inputs = manage_inputs_and_touch
+    return True
+
+# Records that a session just did something
+def touch_session(session_id):
+    record = active_sessions.get(session_id)
+    if record is not None:
+        record["last_activity"] = time.time()
+
+# Stops tracking a session once Shiny reports it has ended
+def unregister_session(session_id):
+    if active_sessions.pop(session_id, None) is not None:
+        session_metrics["ended"] += 1
+
+# Summarizes one session's age, idle time, inputs, outputs and approximate memory
+def session_report(session_id, record, now):
+    session = record["session"]
+    input_ids = dir(session.input)
+    output_count = len(getattr(session.output, "_outputs", ()))  # Shiny keeps no public count
+
+    value_bytes = input_bytes = 0
+    with reactive.isolate():
+        for value in record["values"].values():
+            value_bytes += deep_sizeof(value.get())
+        for input_id in input_ids:
+            value = session.input[input_id]
+            if value.is_set():  # Unclicked buttons exist but have no value yet
+                input_bytes += deep_sizeof(value())
+
+    return {
+        "label": hashlib.sha256(session_id.encode()).hexdigest()[:12],  # Never expose the real session ID
+        "age_seconds": round(now - record["started"], 1),
+        "idle_seconds": round(now - record["last_activity"], 1),
+        "evictable": record["evictable"],
+        "inputs": len(input_ids),
+        "outputs": output_count,
+        "approx_bytes": value_bytes + input_bytes + len(input_ids) * PER_INPUT_BYTES + output_count * PER_OUTPUT_BYTES
+    }
+
+# Report for every live session plus process-wide totals
+def sessions_summary():
+    now = time.time()
+    reports = [session_report(session_id, record, now) for session_id, record in list(active_sessions.items())]
+    return {
+        "active": len(reports),
+        "total_approx_bytes": sum(report["approx_bytes"] for report in reports),
+        "idle_timeout_seconds": SESSION_IDLE_TIMEOUT,
+        **session_metrics,
+        "sessions": sorted(reports, key=lambda report: report["approx_bytes"], reverse=True)
+    }
+
+# Background sweep: closes sessions that have been idle longer than the timeout
+async def sweep_idle_sessions():
+    while active_sessions:
+        await asyncio.sleep(SWEEP_INTERVAL)
+        cutoff = time.time() - SESSION_IDLE_TIMEOUT
+        for session_id, record in list(active_sessions.items()):
+            if record["evictable"] and record["last_activity"] < cutoff:
+                session_metrics["evicted"] += 1
+                await record["session"].close()   # Triggers on_ended, which unregisters it
+                unregister_session(session_id)
+
+# GET endpoint: live session counts and memory footprint for capacity planning
+async def admin_sessions(request: Request):
+    return Response(orjson.dumps(sessions_summary()), media_type="application/json")
+
+# Routes mounted alongside the Shiny app in app.py
+session_routes = [
+    admin_route("/admin/sessions", admin_sessions, methods=["GET"])
+]
@@ -1,6 +1,14 @@
 import random
 import string
 import datetime
+import itertools
+from name_index import NameIndex
+from scheduler import CenterScheduler
+from profiling import profiled
+from outbox import enqueue_dropoff_alert
+
+# Fuzzy name index kept in sync with package_db as packages are added
+name_index = NameIndex()
 
 # Set to store valid test pickup codes for customers
 test_pickup_codes = set()
@@ -36,6 +44,11 @@ def get_random_businesses_with_distances(businesses, count=10):
     selected = random.sample(businesses, count)
     return [f"{business} [{random.uniform(0.5, 10):.1f} miles away]" for business in selected]
 
+# Splits a dropdown choice like "Target [3.2 miles away]" into ("Target", 3.2)
+def split_business_distance(choice):
+    name, _, distance = choice.rpartition(" [")
+    return name, float(distance.split()[0])
+
 # Returns the HTML content for the business contract used during signup
 def get_fake_contract_text():
     return """
@@ -64,13 +77,30 @@ def is_valid_email(email):
     email = email.strip()
     return "@" in email and "." in email and len(email) >= 5
 
-# In-memory database for storing packages in 3 states: on the way, ready, and picked up
+# In-memory database for storing packages in 3 states: on the way, ready, and picked up.
+# Each state maps tracking ID -> package in arrival order, so finding, adding and
+# moving a package are dict operations instead of list scans
 package_db = {
-    "on_the_way": [],
-    "ready_for_pickup": [],
-    "picked_up": []
+    "on_the_way": {},
+    "ready_for_pickup": {},
+    "picked_up": {}
 }
 
+# Returns (state, package) for a tracking ID, or (None, None) if it is unknown
+def find_package(tracking_id):
+    for state, packages in package_db.items():
+        if tracking_id in packages:
+            return state, packages[tracking_id]
+    return None, None
+
+# Adds a new package to package_db and to the name index
+def add_package(pkg):
+    package_db[pkg["status"]][pkg["tracking_id"]] = pkg
+    name_index.add(pkg)
+
+# Tracks how full each retrieval center is and assigns packages to centers
+center_scheduler = CenterScheduler(get_local_businesses())
+
 # Sample name pairs used to generate mock package data
 sample_names = [
     ("Amari", "Thompson"), ("Jordan", "Nguyen"), ("Morgan", "Lee"),
@@ -85,10 +115,43 @@ sample_names = [
     ("Jules", "Wright"), ("Ari", "Ramirez"), ("Jaden", "Morgan")
 ]
 
+# Tracking IDs are PKG + 9 digits. Instead of drawing random numbers (which collide
+# after ~sqrt(space) packages), we walk a shuffled order of the whole space:
+# n -> (offset + n * multiplier) mod space never repeats while the multiplier shares
+# no factor with the space (i.e. is not divisible by 2 or 5)
+TRACKING_ID_SPACE = 10**9
+
+# Picks a multiplier that visits every ID in the space exactly once
+def pick_tracking_id_multiplier(rng):
+    multiplier = rng.randrange(TRACKING_ID_SPACE // 10, TRACKING_ID_SPACE)
+    while multiplier % 2 == 0 or multiplier % 5 == 0:
+        multiplier += 1
+    return multiplier
+
+# Formats the n-th tracking ID of a shuffled sequence
+def make_tracking_id(n, offset, multiplier):
+    return f"PKG{(offset + n * multiplier) % TRACKING_ID_SPACE:09d}"
+
+_tracking_id_offset = random.randrange(TRACKING_ID_SPACE)
+_tracking_id_multiplier = pick_tracking_id_multiplier(random)
+_tracking_id_counter = itertools.count()
+
+# Returns a tracking ID that no package in package_db uses. The sequence never repeats
+# itself, but packages loaded from a fixture come from a different sequence
+def next_tracking_id():
+    while True:
+        tracking_id = make_tracking_id(next(_tracking_id_counter), _tracking_id_offset, _tracking_id_multiplier)
+        if find_package(tracking_id)[1] is None:
+            return tracking_id
+
+# Random nearby centers as (center, miles) candidates for the scheduler
+def nearby_center_candidates():
+    return [split_business_distance(choice) for choice in get_random_businesses_with_distances(get_local_businesses())]
+
 # Creates a dictionary representing a fake package with random attributes
 def generate_mock_package():
     first, last = random.choice(sample_names)
-    tracking_id = f"PKG{random.randint(100000, 999999)}"
+    tracking_id = next_tracking_id()
     size = random.choice(["Small", "Medium", "Large"])
     weight = f"{random.uniform(0.5, 10):.1f} lbs"
     status = "on_the_way"
@@ -96,6 +159,7 @@ def generate_mock_package():
 
     return {
         "name": f"{first} {last}",
+        "email": f"{first}.{last}@example.com".lower(),
         "tracking_id": tracking_id,
         "size": size,
         "weight": weight,
@@ -103,37 +167,147 @@ def generate_mock_package():
         "timestamp": timestamp.strftime("%I:%M %p")
     }
 
-# Populates the package database with 6 mock packages in each status bucket
+# Populates the package database with 6 mock packages in each status bucket.
+# Packages not yet picked up hold a slot at their center, so they go through the scheduler
 def initialize_mock_packages():
     for _ in range(6):
-        package_db["on_the_way"].append(generate_mock_package())
+        p = generate_mock_package()
+        p["center"] = center_scheduler.assign(nearby_center_candidates()) or ""
+        add_package(p)
     for _ in range(6):
         p = generate_mock_package()
         p["status"] = "ready_for_pickup"
-        package_db["ready_for_pickup"].append(p)
+        p["center"] = center_scheduler.assign(nearby_center_candidates()) or ""
+        add_package(p)
     for _ in range(6):
         p = generate_mock_package()
         p["status"] = "picked_up"
+        p["center"] = random.choice(get_local_businesses())
         p["timestamp"] = datetime.datetime.now().strftime("%I:%M %p")
-        package_db["picked_up"].append(p)
+        add_package(p)
+
+# Creates the package a customer is testing pickup for; its center is chosen at lock-in
+def create_customer_package():
+    p = generate_mock_package()
+    p["center"] = ""
+    add_package(p)
+    return p["tracking_id"]
+
+# Routes a package that is still on the way to a center: keeps the preferred center if it
+# has room, otherwise the best nearby one. A previous center's slot is handed back, or
+# kept if no candidate has room. Returns the new center, or None if nothing changed
+def assign_package_center(tracking_id, candidates, preferred=None):
+    state, pkg = find_package(tracking_id)
+    if state != "on_the_way":
+        return None
+    if pkg.get("center"):
+        center_scheduler.release(pkg["center"])
+    center = center_scheduler.assign(candidates, preferred=preferred)
+    if center is None:
+        if pkg.get("center"):
+            center_scheduler.add_load(pkg["center"])
+        return None
+    pkg["center"] = center
+    return center
 
 # Moves a package from one state list to another based on tracking ID
+@profiled("move_package")
 def move_package(tracking_id, from_state, to_state):
-    for pkg in package_db[from_state]:
-        if pkg["tracking_id"] == tracking_id:
-            package_db[from_state].remove(pkg)
-            pkg["status"] = to_state
-            pkg["timestamp"] = datetime.datetime.now().strftime("%I:%M %p")
-            package_db[to_state].append(pkg)
-            return True
-    return False
+    pkg = package_db[from_state].pop(tracking_id, None)
+    if pkg is None:
+        return False
+    if to_state == "picked_up" and pkg.get("center"):
+        center_scheduler.release(pkg["center"])  # Frees the slot at the retrieval center
+    pkg["status"] = to_state
+    pkg["timestamp"] = datetime.datetime.now().strftime("%I:%M %p")
+    package_db[to_state][tracking_id] = pkg
+    if to_state == "ready_for_pickup":
+        enqueue_dropoff_alert(pkg)  # Sent later by the outbox worker, never inline
+    return True
 
 # Searches for a package across all states by name or tracking ID
+@profiled("search_package")
 def search_package(query):
     results = []
     query = query.lower().strip()
     for state in package_db:
-        for pkg in package_db[state]:
+        for pkg in package_db[state].values():
             if query in pkg["tracking_id"].lower() or query in pkg["name"].lower():
                 results.append(pkg)
     return results
+
+# Center a package holds a slot at: its center until it is picked up, otherwise none
+def held_center(pkg):
+    if pkg is None or pkg["status"] == "picked_up":
+        return None
+    return pkg.get("center") or None
+
+# Applies a batch of carrier status events to the package database in one pass
+# Each event needs a "tracking_id" and a "status" (one of the package_db states), and may
+# carry the "center" the carrier delivers to or "nearby_centers" ({center: miles}).
+# Unknown tracking IDs are added as new packages using the event's details, and
+# packages still without a center are routed through the scheduler as one manifest
+@profiled("apply_status_events")
+def apply_status_events(events):
+    timestamp = datetime.datetime.now().strftime("%I:%M %p")
+    touched = {}      # tracking_id -> package for every package in this batch
+    from_states = {}  # tracking_id -> state before this batch (None for new packages)
+    from_centers = {}  # tracking_id -> center holding a slot for it before this batch
+    nearby = {}       # tracking_id -> (center, miles) candidates sent by the carrier
+    for event in events:
+        tracking_id = event["tracking_id"]
+        state, pkg = find_package(tracking_id)
+        if tracking_id not in touched:
+            from_states[tracking_id] = state
+            from_centers[tracking_id] = held_center(pkg)
+        if pkg is None:
+            pkg = {
+                "name": event.get("name", "Unknown"),
+                "email": event.get("email", ""),
+                "tracking_id": tracking_id,
+                "size": event.get("size", "Medium"),
+                "weight": event.get("weight", "0.0 lbs"),
+                "center": ""
+            }
+            name_index.add(pkg)
+        elif state != event["status"]:
+            del package_db[state][tracking_id]
+        pkg["status"] = event["status"]
+        pkg["timestamp"] = timestamp
+        if event.get("center"):
+            pkg["center"] = event["center"]
+        if event.get("nearby_centers"):
+            nearby[tracking_id] = list(event["nearby_centers"].items())
+        package_db[pkg["status"]][tracking_id] = pkg
+        touched[tracking_id] = pkg
+
+    # Move slots to match each package's net change (picked up, re-routed, re-opened)
+    for tracking_id, pkg in touched.items():
+        before, after = from_centers[tracking_id], held_center(pkg)
+        if before != after:
+            if before:
+                center_scheduler.release(before)
+            if after:
+                center_scheduler.add_load(after)
+
+    # Packages the carrier didn't route: nearest centers with room when the carrier sent
+    # distances, otherwise the least loaded center anywhere
+    unrouted = [pkg for pkg in touched.values() if not pkg.get("center") and pkg["status"] != "picked_up"]
+    with_distances = [pkg for pkg in unrouted if pkg["tracking_id"] in nearby]
+    without_distances = [pkg for pkg in unrouted if pkg["tracking_id"] not in nearby]
+    everywhere = [(center, 0.0) for center in center_scheduler.capacity]
+    centers = center_scheduler.assign_manifest([nearby[pkg["tracking_id"]] for pkg in with_distances])
+    centers += center_scheduler.assign_manifest([everywhere] * len(without_distances), k=len(everywhere))
+    for pkg, center in zip(with_distances + without_distances, centers):
+        pkg["center"] = center or ""
+
+    # Alerts follow each package's net change, not every intermediate event
+    for tracking_id, pkg in touched.items():
+        if pkg["status"] == "ready_for_pickup" and from_states[tracking_id] != "ready_for_pickup":
+            enqueue_dropoff_alert(pkg)
+    return len(events)
+
+# Typo-tolerant search by customer name, ranked by edit distance (closest first)
+@profiled("fuzzy_search_package")
+def fuzzy_search_package(query, max_distance=2, limit=10):
+    return name_index.search(query.strip(), max_distance=max_distance, limit=limit)
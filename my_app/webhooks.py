@@ -0,0 +1,193 @@
+import asyncio                              # Bounded queue and background consumer task
+import hmac                                 # Constant-time carrier token comparison
+import os                                   # Carrier tokens from the environment
+import traceback                            # Logs batches that fail to commit
+import orjson                               # Fast JSON parsing/encoding for carrier payloads
+from starlette.requests import Request      # Incoming HTTP request from a carrier
+from starlette.responses import Response    # Raw response so we can send orjson bytes
+from starlette.routing import Route         # Route definitions mounted next to the Shiny app
+from utils import package_db, apply_status_events, is_valid_email
+
+# Maximum number of events waiting to be committed before carriers get a 429
+QUEUE_MAX_SIZE = 10000
+# Largest list accepted in one request; bigger payloads get a 413 and must be split
+MAX_EVENTS_PER_REQUEST = 1000
+# Largest request body in bytes; checked before the body is read
+MAX_BODY_BYTES = 1_000_000
+# Largest number of events committed to the package store in one micro-batch
+BATCH_SIZE = 500
+# Seconds a carrier is told to wait before retrying when the queue is full
+RETRY_AFTER_SECONDS = 1
+
+# Shared secret per carrier, from SAFEDROP_CARRIER_TOKENS="ups=token1,fedex=token2".
+# Carriers send "Authorization: Bearer <token>"; with no tokens configured every
+# carrier request is refused
+CARRIER_TOKENS = dict(
+    entry.strip().split("=", 1) for entry in os.environ.get("SAFEDROP_CARRIER_TOKENS", "").split(",") if "=" in entry
+)
+
+# Queue and consumer task are created lazily inside the running event loop
+event_queue = None
+consumer_task = None
+
+# Running counters exposed through the metrics endpoint
+queue_metrics = {
+    "accepted": 0,
+    "rejected": 0,
+    "committed": 0,
+    "batches": 0,
+    "failed_batches": 0,
+    "failed_events": 0,
+    "last_batch_size": 0
+}
+
+# Builds a JSON response from any orjson-serializable value
+def json_response(content, status_code=200, headers=None):
+    return Response(orjson.dumps(content), status_code=status_code, headers=headers, media_type="application/json")
+
+# Returns the event queue, starting the consumer the first time it is needed
+def get_event_queue():
+    global event_queue, consumer_task
+    if event_queue is None:
+        event_queue = asyncio.Queue(maxsize=QUEUE_MAX_SIZE)
+    if consumer_task is None or consumer_task.done():
+        consumer_task = asyncio.get_running_loop().create_task(consume_events())
+    return event_queue
+
+# Returns the carrier whose token the request carries, "" if no bearer token was
+# sent, or None if the token matches no carrier
+def authenticate_carrier(request):
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return ""
+    carrier = None
+    for name, expected in CARRIER_TOKENS.items():
+        # Compare against every token so the response time doesn't reveal which one matched
+        if hmac.compare_digest(token.encode(), expected.encode()):
+            carrier = name
+    return carrier
+
+# Reads the request body, or returns None once it grows past MAX_BODY_BYTES
+async def read_limited_body(request):
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            return None
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+# Checks a single carrier event and returns an error message, or None if it is valid
+def validate_event(event):
+    if not isinstance(event, dict):
+        return "Each event must be a JSON object"
+    if not isinstance(event.get("tracking_id"), str) or not event["tracking_id"].strip():
+        return "Each event needs a tracking_id"
+    if not isinstance(event.get("status"), str) or event["status"] not in package_db:
+        return f"status must be one of: {', '.join(package_db)}"
+    for field in ("name", "size", "weight", "center"):
+        if field in event and not isinstance(event[field], str):
+            return f"{field} must be a string"
+    if "nearby_centers" in event:
+        nearby = event["nearby_centers"]
+        if not isinstance(nearby, dict) or not all(
+            isinstance(miles, (int, float)) and not isinstance(miles, bool) and miles >= 0 for miles in nearby.values()
+        ):
+            return "nearby_centers must map center names to non-negative miles"
+    if "email" in event:
+        email = event["email"]
+        # Whitespace covers newlines, which would otherwise reach the email headers
+        if not isinstance(email, str) or not is_valid_email(email) or any(char.isspace() for char in email):
+            return "email must be a valid email address"
+    return None
+
+# Background consumer: waits for events, then commits whatever is queued in micro-batches
+async def consume_events():
+    queue = event_queue
+    while True:
+        batch = [await queue.get()]
+        while len(batch) < BATCH_SIZE and not queue.empty():
+            batch.append(queue.get_nowait())
+
+        try:
+            apply_status_events(batch)
+            queue_metrics["committed"] += len(batch)
+            queue_metrics["batches"] += 1
+            queue_metrics["last_batch_size"] = len(batch)
+        except Exception:
+            # Keep consuming; a bad batch must not stop ingestion for every carrier
+            traceback.print_exc()
+            queue_metrics["failed_batches"] += 1
+            queue_metrics["failed_events"] += len(batch)
+        finally:
+            for _ in batch:
+                queue.task_done()
+
+        # Give interactive Shiny sessions a turn on the event loop between batches
+        await asyncio.sleep(0)
+
+# POST endpoint: accepts one event object or a list of events
+async def carrier_events(request: Request):
+    carrier = authenticate_carrier(request)
+    if carrier == "":
+        return json_response({"error": "Carrier token required"}, status_code=401, headers={"WWW-Authenticate": "Bearer"})
+    if carrier is None:
+        return json_response({"error": "Unknown carrier token"}, status_code=403)
+
+    too_large = json_response({"error": "Request body too large", "max_body_bytes": MAX_BODY_BYTES}, status_code=413)
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > MAX_BODY_BYTES:
+        return too_large
+    # Chunked bodies have no Content-Length, so the size is also capped while reading
+    body = await read_limited_body(request)
+    if body is None:
+        return too_large
+    try:
+        payload = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        return json_response({"error": "Body must be valid JSON"}, status_code=400)
+
+    events = payload if isinstance(payload, list) else [payload]
+    if not events:
+        return json_response({"error": "No events provided"}, status_code=400)
+    if len(events) > MAX_EVENTS_PER_REQUEST:
+        return json_response(
+            {"error": "Too many events in one request", "max_events_per_request": MAX_EVENTS_PER_REQUEST},
+            status_code=413
+        )
+    for position, event in enumerate(events):
+        error = validate_event(event)
+        if error:
+            return json_response({"error": error, "index": position}, status_code=400)
+
+    # Accept the whole batch or none of it, so carriers can simply retry on 429
+    queue = get_event_queue()
+    if queue.maxsize - queue.qsize() < len(events):
+        queue_metrics["rejected"] += len(events)
+        return json_response(
+            {"error": "Event queue is full, please retry", "queue_depth": queue.qsize()},
+            status_code=429,
+            headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+        )
+
+    for event in events:
+        queue.put_nowait(event)
+    queue_metrics["accepted"] += len(events)
+    return json_response({"accepted": len(events), "queue_depth": queue.qsize()}, status_code=202)
+
+# GET endpoint: reports queue depth and ingestion counters
+async def carrier_metrics(request: Request):
+    depth = event_queue.qsize() if event_queue is not None else 0
+    return json_response({
+        "queue_depth": depth,
+        "queue_max_size": QUEUE_MAX_SIZE,
+        "max_events_per_request": MAX_EVENTS_PER_REQUEST,
+        "max_body_bytes": MAX_BODY_BYTES,
+        **queue_metrics
+    })
+
+# Routes mounted alongside the Shiny app in app.py
+webhook_routes = [
+    Route("/webhooks/carrier", carrier_events, methods=["POST"]),
+    Route("/webhooks/metrics", carrier_metrics, methods=["GET"])
+]
@@ -0,0 +1,36 @@
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.testclient import TestClient
+
+import admin
+
+
+async def secret(request):
+    return PlainTextResponse("ok")
+
+
+def client():
+    return TestClient(Starlette(routes=[admin.admin_route("/admin/secret", secret, methods=["GET"])]))
+
+
+def test_admin_routes_are_disabled_without_a_token(monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "")
+    for headers in ({}, {"Authorization": "Bearer "}, {"X-Forwarded-For": "127.0.0.1"}):
+        response = client().get("/admin/secret", headers=headers)
+        assert response.status_code == 403
+        assert "SAFEDROP_ADMIN_TOKEN" in response.json()["error"]
+
+
+def test_loopback_clients_still_need_a_token(monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "")
+    local = TestClient(Starlette(routes=[admin.admin_route("/admin/secret", secret, methods=["GET"])]), client=("127.0.0.1", 50000))
+    assert local.get("/admin/secret").status_code == 403
+
+
+def test_token_grants_access(monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "s3cret")
+    assert client().get("/admin/secret").status_code == 403
+    assert client().get("/admin/secret", headers={"Authorization": "Bearer wrong"}).status_code == 403
+    response = client().get("/admin/secret", headers={"Authorization": "Bearer s3cret"})
+    assert response.status_code == 200
+    assert response.text == "ok"
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+import mock_data
+import utils
+from scheduler import CenterScheduler
+
+
+@pytest.fixture
+def empty_db(monkeypatch):
+    for state in utils.package_db:
+        utils.package_db[state].clear()
+    scheduler = CenterScheduler(utils.get_local_businesses())
+    monkeypatch.setattr(utils, "center_scheduler", scheduler)
+    monkeypatch.setattr(mock_data, "center_scheduler", scheduler)
+    return scheduler
+
+
+def test_same_seed_gives_the_same_packages():
+    first = list(mock_data.generate_package_batches(5000, seed=7, batch_size=2000))
+    second = list(mock_data.generate_package_batches(5000, seed=7, batch_size=2000))
+    assert len(first) == len(second) == 3
+    for a, b in zip(first, second):
+        for field in mock_data.PACKAGE_FIELDS:
+            assert np.array_equal(a[field], b[field])
+
+    other = next(mock_data.generate_package_batches(2000, seed=8, batch_size=2000))
+    assert not np.array_equal(first[0]["tracking_id"], other["tracking_id"])
+
+
+def test_tracking_ids_are_unique_within_a_seed():
+    ids = np.concatenate([batch["tracking_id"] for batch in mock_data.generate_package_batches(200_000, seed=3)])
+    assert len(ids) == 200_000
+    assert len(np.unique(ids)) == 200_000
+    assert all(len(tracking_id) == 12 and tracking_id.startswith("PKG") for tracking_id in ids[:100])
+
+
+def test_loading_skips_ids_already_in_use(empty_db):
+    taken = next(mock_data.generate_package_batches(2, seed=5))["tracking_id"].tolist()
+    for tracking_id in taken:
+        utils.add_package({"name": "Avery Kim", "tracking_id": tracking_id, "size": "Small", "weight": "1.0 lbs", "status": "picked_up", "center": "", "timestamp": ""})
+
+    assert mock_data.load_packages_into_db(3000, seed=5) == 2
+    assert sum(len(packages) for packages in utils.package_db.values()) == 3002
+
+    # The app's own sequence also steps around loaded IDs
+    assert utils.find_package(utils.next_tracking_id()) == (None, None)
+
+
+def test_loading_sizes_centers_for_the_fixture(empty_db):
+    mock_data.load_packages_into_db(20_000, seed=1)
+    metrics = empty_db.balance_metrics()
+    assert metrics["total_load"] == len(utils.package_db["on_the_way"]) + len(utils.package_db["ready_for_pickup"])
+    assert 0.5 < metrics["max_utilization"] <= mock_data.LOADED_UTILIZATION
+    assert metrics["full_centers"] == 0
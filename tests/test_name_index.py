@@ -0,0 +1,85 @@
+import pytest
+
+from name_index import NameIndex, deletion_variants, levenshtein
+
+
+def package(tracking_id, name):
+    return {"tracking_id": tracking_id, "name": name}
+
+
+def ids(results):
+    return [pkg["tracking_id"] for pkg in results]
+
+
+@pytest.mark.parametrize("a, b, distance", [
+    ("", "", 0),
+    ("", "abc", 3),
+    ("kitten", "sitting", 3),
+    ("flaw", "lawn", 2),
+    ("nguyen", "nguyen", 0),
+    ("nguyen", "ngyuen", 2),
+    ("thompson", "thomson", 1),
+])
+def test_levenshtein(a, b, distance):
+    assert levenshtein(a, b) == distance
+    assert levenshtein(b, a) == distance
+
+
+def test_deletion_variants():
+    assert deletion_variants("abc", 1) == {"abc", "ab", "ac", "bc"}
+    assert "" in deletion_variants("ab", 2)
+
+
+@pytest.fixture
+def index():
+    index = NameIndex()
+    for tracking_id, name in [
+        ("PKG1", "Jordan Nguyen"),
+        ("PKG2", "Emery Nguyen"),
+        ("PKG3", "Jordan Lee"),
+        ("PKG4", "Jordan  NGUYEN"),   # Same person once names are normalized
+        ("PKG5", "Jordyn Nguyen"),
+        ("PKG6", "Morgan Lee"),
+    ]:
+        index.add(package(tracking_id, name))
+    return index
+
+
+def test_every_query_token_must_match(index):
+    assert ids(index.search("jordan nguyen")) == ["PKG1", "PKG4", "PKG5"]
+    # Exact "jordan" names first (ties broken by name), then "jordyn" (1 edit), then "morgan" (2 edits)
+    assert ids(index.search("jordan")) == ["PKG3", "PKG1", "PKG4", "PKG5", "PKG6"]
+    assert index.search("jordan smith") == []
+    assert index.search("   ") == []
+
+
+def test_scores_add_up_across_tokens_and_rank_closest_first(index):
+    # "jordyn nguyen" is 0 + 0 away, "jordan nguyen" is 1 + 0 and "jordan lee" doesn't match "nguyen"
+    assert ids(index.search("Jordyn Nguyen")) == ["PKG5", "PKG1", "PKG4"]
+    # Ties are broken by name so results are stable
+    assert ids(index.search("nguyen")) == ["PKG2", "PKG1", "PKG4", "PKG5"]
+
+
+def test_max_distance_is_clamped_to_the_index(index):
+    assert ids(index.search("jordan ngyuen", max_distance=0)) == []
+    assert ids(index.search("jordan ngyuen", max_distance=2)) == ["PKG1", "PKG4", "PKG5"]
+    # Variants were only indexed two deletions deep, so "jxrdxx" (3 edits from "jordan")
+    # stays out of reach however large a distance is asked for
+    assert index.search("jxrdxx", max_distance=5) == []
+    assert ids(index.search("jxrdxn", max_distance=5)) == ids(index.search("jxrdxn", max_distance=2))
+
+    deeper = NameIndex(max_distance=3)
+    deeper.add(package("PKG1", "Jordan Nguyen"))
+    assert ids(deeper.search("jxrdxx", max_distance=5)) == ["PKG1"]
+    assert deeper.search("jxrdxx", max_distance=2) == []
+
+
+def test_limit_counts_packages_across_names(index):
+    assert ids(index.search("nguyen", limit=3)) == ["PKG2", "PKG1", "PKG4"]  # PKG1 and PKG4 share a name
+    assert ids(index.search("lee", limit=1)) == ["PKG3"]
+
+
+def test_adding_a_package_twice_keeps_one_copy(index):
+    index.add(package("PKG6", "Morgan Lee"))
+    assert ids(index.search("morgan lee")) == ["PKG6", "PKG3"]  # "jordan lee" is 2 edits away
+    assert list(index.packages_by_name["morgan lee"]) == ["PKG6"]
@@ -0,0 +1,130 @@
+import asyncio
+import socket
+
+import pytest
+from aiosmtpd.controller import Controller
+
+import outbox
+
+
+# Collects every message the local SMTP stand-in receives
+class Inbox:
+    def __init__(self):
+        self.messages = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return "250 OK"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp(monkeypatch):
+    port = free_port()
+    monkeypatch.setattr(outbox, "SMTP_HOST", "localhost")
+    monkeypatch.setattr(outbox, "SMTP_PORT", port)
+    monkeypatch.setattr(outbox, "COALESCE_SECONDS", 0.05)
+    monkeypatch.setattr(outbox, "RETRY_BASE_SECONDS", 0.1)
+    monkeypatch.setattr(outbox, "pending", {})
+    monkeypatch.setattr(outbox, "retrying", [])
+    monkeypatch.setattr(outbox, "worker_task", None)
+    monkeypatch.setattr(outbox, "connection_pool", None)
+    for key in outbox.outbox_metrics:
+        monkeypatch.setitem(outbox.outbox_metrics, key, 0)
+    inbox = Inbox()
+    controller = Controller(inbox, hostname="localhost", port=port)
+    yield inbox, controller
+    if controller._thread is not None:
+        controller.stop()
+
+
+def package(tracking_id, email):
+    return {"tracking_id": tracking_id, "name": "Jordan Nguyen", "email": email, "center": "Target"}
+
+
+async def wait_until(condition, timeout=5.0):
+    for _ in range(int(timeout / 0.02)):
+        if condition():
+            return
+        await asyncio.sleep(0.02)
+    raise AssertionError("condition not met in time")
+
+
+def test_alerts_for_one_recipient_are_coalesced(smtp):
+    inbox, controller = smtp
+    controller.start()
+
+    async def scenario():
+        for tracking_id in ("PKG1", "PKG2", "PKG3"):
+            outbox.enqueue_dropoff_alert(package(tracking_id, "jordan@example.com"))
+        outbox.enqueue_dropoff_alert(package("PKG4", "avery@example.com"))
+        await wait_until(lambda: outbox.outbox_metrics["sent_alerts"] == 4)
+        outbox.worker_task.cancel()
+
+    asyncio.run(scenario())
+    assert outbox.outbox_metrics["sent_emails"] == 2
+    by_recipient = {message.rcpt_tos[0]: message.content.decode() for message in inbox.messages}
+    assert set(by_recipient) == {"jordan@example.com", "avery@example.com"}
+    assert all(tracking_id in by_recipient["jordan@example.com"] for tracking_id in ("PKG1", "PKG2", "PKG3"))
+
+
+def test_failed_sends_are_retried_until_the_server_is_back(smtp):
+    inbox, controller = smtp
+
+    async def scenario():
+        outbox.enqueue_dropoff_alert(package("PKG1", "jordan@example.com"))
+        await wait_until(lambda: outbox.outbox_metrics["retried"] >= 1)
+        controller.start()
+        await wait_until(lambda: outbox.outbox_metrics["sent_alerts"] == 1)
+        outbox.worker_task.cancel()
+
+    asyncio.run(scenario())
+    assert len(inbox.messages) == 1
+    assert outbox.outbox_metrics["failed"] == 0
+    assert outbox.outbox_summary()["pending_alerts"] == 0
+
+
+def test_retries_show_up_in_the_backlog(smtp, monkeypatch):
+    inbox, controller = smtp
+    monkeypatch.setattr(outbox, "RETRY_BASE_SECONDS", 0.5)
+
+    async def scenario():
+        outbox.enqueue_dropoff_alert(package("PKG1", "jordan@example.com"))
+        await wait_until(lambda: outbox.outbox_metrics["retried"] == 1)
+        summary = outbox.outbox_summary()
+        assert summary["pending_alerts"] == 0
+        assert summary["retrying_emails"] == summary["retrying_alerts"] == 1
+        assert 0 < summary["next_retry_in_seconds"] <= outbox.RETRY_BASE_SECONDS  # First retry after the base delay
+        assert summary["queue_lag_seconds"] > 0
+
+        controller.start()
+        await wait_until(lambda: outbox.outbox_metrics["sent_alerts"] == 1)
+        outbox.worker_task.cancel()
+
+    asyncio.run(scenario())
+    summary = outbox.outbox_summary()
+    assert summary["retrying_alerts"] == 0
+    assert summary["next_retry_in_seconds"] is None
+    assert summary["queue_lag_seconds"] == 0.0
+
+
+def test_bad_recipient_is_counted_and_does_not_stop_the_worker(smtp):
+    inbox, controller = smtp
+    controller.start()
+
+    async def scenario():
+        outbox.enqueue_dropoff_alert(package("PKG1", "bad@example.com\nBcc: everyone@example.com"))
+        outbox.enqueue_dropoff_alert(package("PKG2", "avery@example.com"))
+        await wait_until(lambda: outbox.outbox_metrics["sent_alerts"] == 1 and outbox.outbox_metrics["failed"] == 1)
+        outbox.enqueue_dropoff_alert(package("PKG3", "avery@example.com"))
+        await wait_until(lambda: outbox.outbox_metrics["sent_alerts"] == 2)
+        assert not outbox.worker_task.done()
+        outbox.worker_task.cancel()
+
+    asyncio.run(scenario())
+    assert [message.rcpt_tos for message in inbox.messages] == [["avery@example.com"], ["avery@example.com"]]
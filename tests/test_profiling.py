@@ -0,0 +1,159 @@
+import asyncio
+import collections
+import time
+from pathlib import Path
+
+import pytest
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+import admin
+import profiling
+
+
+@pytest.fixture
+def profiles(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "profiling_enabled", True)
+    monkeypatch.setattr(profiling, "slow_action_seconds", 0.0)
+    monkeypatch.setattr(profiling, "PROFILE_DIR", tmp_path / "profiles")
+    monkeypatch.setattr(profiling, "recent_profiles", collections.deque(maxlen=2))
+    monkeypatch.setattr(profiling, "_profile_running", False)
+    return profiling.recent_profiles
+
+
+def busy_work(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def profile_files(record):
+    return [Path(record["files"] + suffix) for suffix in (".pstats", ".folded")]
+
+
+def test_sync_actions_are_profiled_from_real_stacks(profiles):
+    @profiling.profiled("sync_action")
+    def action():
+        busy_work(0.05)
+        return "done"
+
+    assert action() == "done"
+    profiling.flush_profile_writes()
+
+    [record] = profiles
+    assert record["action"] == "sync_action"
+    assert record["samples"] > 0
+    assert all(path.exists() for path in profile_files(record))
+    folded = profile_files(record)[1].read_text().splitlines()
+    assert any("test_profiling.py" in line and line.split(";")[-1].startswith("test_profiling.py") for line in folded)
+    assert all(line.count(";") < profiling.MAX_STACK_DEPTH for line in folded)
+
+
+def test_async_actions_are_profiled_across_awaits(profiles):
+    @profiling.profiled("async_action")
+    async def action():
+        await asyncio.sleep(0.01)
+        busy_work(0.02)
+        return 42
+
+    assert asyncio.run(action()) == 42
+    profiling.flush_profile_writes()
+    assert [record["action"] for record in profiles] == ["async_action"]
+    assert profiles[0]["seconds"] >= 0.03
+
+
+def test_fast_actions_and_nested_calls_are_not_kept(profiles, monkeypatch):
+    monkeypatch.setattr(profiling, "slow_action_seconds", 10.0)
+
+    @profiling.profiled("inner")
+    def inner():
+        return 1
+
+    @profiling.profiled("outer")
+    def outer():
+        assert profiling.start_profile() is None  # Only one profile runs at a time
+        return inner() + 1
+
+    assert outer() == 2
+    assert len(profiles) == 0
+    assert profiling._profile_running is False
+
+
+def test_errors_from_the_action_still_propagate(profiles):
+    @profiling.profiled("failing_action")
+    def action():
+        raise KeyError("missing")
+
+    with pytest.raises(KeyError):
+        action()
+    assert [record["action"] for record in profiles] == ["failing_action"]
+    assert profiling._profile_running is False
+
+
+def test_profiler_and_file_errors_never_reach_the_action(profiles, monkeypatch, tmp_path, capsys):
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    monkeypatch.setattr(profiling, "PROFILE_DIR", blocker / "profiles")
+
+    @profiling.profiled("action")
+    def action():
+        return "ok"
+
+    assert action() == "ok"  # mkdir fails on the writer thread
+    profiling.flush_profile_writes()
+    assert "NotADirectoryError" in capsys.readouterr().err
+
+    def broken_record(*args):
+        raise RuntimeError("profiler broke")
+
+    monkeypatch.setattr(profiling, "record_profile", broken_record)
+    assert action() == "ok"
+    assert "profiler broke" in capsys.readouterr().err
+    assert profiling._profile_running is False
+
+
+def test_profiles_that_drop_out_of_the_buffer_lose_their_files(profiles):
+    @profiling.profiled("action")
+    def action():
+        return None
+
+    for _ in range(3):
+        action()
+    profiling.flush_profile_writes()
+
+    assert len(profiles) == 2
+    kept = [path for record in profiles for path in profile_files(record)]
+    assert all(path.exists() for path in kept)
+    written = sorted(path for path in profiling.PROFILE_DIR.iterdir())
+    assert written == sorted(kept)  # The first profile's files were deleted
+
+
+@pytest.fixture
+def admin_client(monkeypatch):
+    monkeypatch.setattr(admin, "ADMIN_TOKEN", "s3cret")
+    monkeypatch.setattr(profiling, "profiling_enabled", False)
+    monkeypatch.setattr(profiling, "slow_action_seconds", 0.5)
+    return TestClient(Starlette(routes=profiling.profiling_routes), headers={"Authorization": "Bearer s3cret"})
+
+
+@pytest.mark.parametrize("body", [
+    b"not json",
+    b"[]",
+    b'{"enabled": "yes"}',
+    b'{"slow_action_seconds": -1}',
+    b'{"slow_action_seconds": true}',
+    b'{"slow_action_seconds": "0.2"}',
+])
+def test_invalid_profiling_settings_are_rejected(admin_client, body):
+    response = admin_client.post("/admin/profiling", content=body)
+    assert response.status_code == 400
+    assert profiling.profiling_enabled is False
+    assert profiling.slow_action_seconds == 0.5
+
+
+def test_profiling_settings_can_be_changed(admin_client):
+    response = admin_client.post("/admin/profiling", json={"enabled": True, "slow_action_seconds": 0.2})
+    assert response.status_code == 200
+    assert response.json()["enabled"] is True
+    assert profiling.slow_action_seconds == 0.2
+    assert admin_client.get("/admin/profiles", headers={"Authorization": "Bearer wrong"}).status_code == 403
@@ -0,0 +1,72 @@
+import pytest
+
+from scheduler import CenterScheduler, FULL_CENTER_PENALTY_MILES
+
+
+@pytest.fixture
+def scheduler():
+    return CenterScheduler(["Target", "Walmart", "Kroger", "QuickMart"], capacity=2)
+
+
+def test_assign_keeps_the_preferred_center_while_it_has_room(scheduler):
+    candidates = [("Target", 1.0), ("Walmart", 2.0)]
+    assert scheduler.assign(candidates, preferred="Walmart") == "Walmart"
+    assert scheduler.assign(candidates, preferred="Walmart") == "Walmart"
+    assert scheduler.assign(candidates, preferred="Walmart") == "Target"  # Walmart is full
+    assert scheduler.load == {"Target": 1, "Walmart": 2, "Kroger": 0, "QuickMart": 0}
+    assert (scheduler.assigned, scheduler.redirected, scheduler.overflowed) == (3, 1, 0)
+
+
+def test_assign_returns_none_when_every_candidate_is_full(scheduler):
+    scheduler.set_capacity("Target", 1)
+    assert scheduler.assign([("Target", 1.0)]) == "Target"
+    assert scheduler.assign([("Target", 1.0)]) is None
+    assert scheduler.load["Target"] == 1
+    assert scheduler.overflowed == 1
+
+
+def test_suggest_only_considers_the_k_nearest_centers_with_room(scheduler):
+    candidates = [("Target", 1.0), ("Walmart", 2.0), ("Kroger", 3.0), ("QuickMart", 0.5)]
+    assert scheduler.suggest(candidates) == "QuickMart"
+    scheduler.set_capacity("QuickMart", 0)
+    assert scheduler.suggest(candidates, k=1) == "Target"
+    assert scheduler.suggest([("Unknown", 0.1)]) is None  # Centers without capacity never have room
+
+
+def test_suggest_trades_distance_for_emptier_centers(scheduler):
+    scheduler.set_capacity("Target", 10)
+    scheduler.set_capacity("Walmart", 10)
+    for _ in range(9):
+        scheduler.add_load("Target")
+    # Target is 1 mile closer but 90% full: 1 + 0.9 * penalty > 2
+    assert FULL_CENTER_PENALTY_MILES * 0.9 > 1.0
+    assert scheduler.suggest([("Target", 1.0), ("Walmart", 2.0)]) == "Walmart"
+
+
+def test_assign_manifest_spreads_rows_across_centers(scheduler):
+    rows = [[("Target", 1.0), ("Walmart", 1.0)]] * 5
+    assert scheduler.assign_manifest(rows) == ["Target", "Walmart", "Target", "Walmart", None]
+
+
+def test_release_frees_a_slot_and_never_goes_negative(scheduler):
+    scheduler.assign([("Kroger", 1.0)])
+    scheduler.release("Kroger")
+    scheduler.release("Kroger")
+    scheduler.release("Unknown")
+    assert scheduler.load["Kroger"] == 0
+    assert scheduler.has_room("Kroger")
+
+
+def test_balance_metrics(scheduler):
+    scheduler.add_load("Target")
+    scheduler.add_load("Target")
+    scheduler.add_load("Walmart")
+    metrics = scheduler.balance_metrics()
+    assert metrics["centers"] == 4
+    assert metrics["total_load"] == 3
+    assert metrics["total_capacity"] == 8
+    assert metrics["max_utilization"] == 1.0
+    assert metrics["min_utilization"] == 0.0
+    assert metrics["mean_utilization"] == pytest.approx(0.375)
+    assert metrics["full_centers"] == 1
+    assert metrics["utilization"]["Walmart"] == 0.5
@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+import sessions
+
+
+# Just enough of a Shiny session for register_session and the idle sweep
+class FakeSession:
+    def __init__(self, session_id, has_input_handler=True):
+        self.id = session_id
+        self.closed = False
+        self.ended_callbacks = []
+        if has_input_handler:
+            self._manage_inputs = lambda data: None
+
+    def on_ended(self, callback):
+        self.ended_callbacks.append(callback)
+
+    async def close(self):
+        self.closed = True
+        for callback in self.ended_callbacks:
+            callback()
+
+
+@pytest.fixture(autouse=True)
+def fresh_sessions(monkeypatch):
+    monkeypatch.setattr(sessions, "SESSION_IDLE_TIMEOUT", 0.2)
+    monkeypatch.setattr(sessions, "SWEEP_INTERVAL", 0.05)
+    monkeypatch.setattr(sessions, "active_sessions", {})
+    monkeypatch.setattr(sessions, "sweep_task", None)
+    for key in sessions.session_metrics:
+        monkeypatch.setitem(sessions.session_metrics, key, 0)
+
+
+def test_input_keeps_a_session_alive_and_idleness_evicts_it():
+    busy, idle = FakeSession("busy"), FakeSession("idle")
+
+    async def scenario():
+        sessions.register_session(busy, {})
+        sessions.register_session(idle, {})
+        for _ in range(10):
+            busy._manage_inputs({"search_query": "Avery"})
+            idle._manage_inputs({".clientdata_output_width": 800})  # Sent by the browser, not the user
+            await asyncio.sleep(0.05)
+        sessions.sweep_task.cancel()
+
+    asyncio.run(scenario())
+    assert not busy.closed
+    assert idle.closed
+    assert list(sessions.active_sessions) == ["busy"]
+    assert sessions.session_metrics == {"started": 2, "ended": 1, "evicted": 1}
+
+
+def test_sessions_without_input_tracking_are_never_evicted():
+    session = FakeSession("untracked", has_input_handler=False)
+
+    async def scenario():
+        with pytest.warns(RuntimeWarning, match="_manage_inputs"):
+            sessions.register_session(session, {})
+        await asyncio.sleep(0.4)
+        sessions.sweep_task.cancel()
+
+    asyncio.run(scenario())
+    assert not session.closed
+    assert sessions.active_sessions["untracked"]["evictable"] is False
+    assert sessions.session_metrics["evicted"] == 0